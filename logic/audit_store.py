@@ -0,0 +1,236 @@
+import json
+import sqlite3
+import uuid
+
+from logic.normalize_typeform import find_answer
+
+# Cohort bands used by the precomputed aggregates
+AGE_BANDS = [
+    ("under_30", 0, 30),
+    ("30_49", 30, 50),
+    ("50_plus", 50, 200),
+]
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit_outputs (
+    output_id TEXT PRIMARY KEY,
+    user_name TEXT,
+    created_at TEXT,
+    age INTEGER,
+    home_country TEXT
+);
+
+CREATE TABLE IF NOT EXISTS audit_rows (
+    output_id TEXT NOT NULL REFERENCES audit_outputs(output_id) ON DELETE CASCADE,
+    trip TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    score REAL,
+    tier TEXT,
+    pb_sd TEXT,
+    continent TEXT,
+    PRIMARY KEY (output_id, rank)
+);
+
+CREATE INDEX IF NOT EXISTS audit_rows_trip_rank_idx ON audit_rows (trip, rank);
+CREATE INDEX IF NOT EXISTS audit_rows_continent_idx ON audit_rows (continent);
+CREATE INDEX IF NOT EXISTS audit_outputs_age_idx ON audit_outputs (age);
+
+CREATE TABLE IF NOT EXISTS cohort_aggregates (
+    cohort TEXT NOT NULL,
+    trip TEXT NOT NULL,
+    outputs INTEGER,
+    top8_count INTEGER,
+    top8_rate REAL,
+    top13_count INTEGER,
+    mean_rank REAL,
+    mean_score REAL,
+    PRIMARY KEY (cohort, trip)
+);
+"""
+
+AGGREGATE_COLUMNS = [
+    "cohort", "trip", "outputs", "top8_count", "top8_rate",
+    "top13_count", "mean_rank", "mean_score",
+]
+
+
+def age_band(age):
+    if age is None:
+        return "unknown"
+    for name, low, high in AGE_BANDS:
+        if low <= age < high:
+            return name
+    return "unknown"
+
+
+def output_record(output_id, user_name: str, created_at, normalized_user: dict) -> dict:
+    """
+    Per-output cohort attributes (one row per trip_outputs row).
+    """
+    age = find_answer(normalized_user, "What is your age")
+    try:
+        age = int(age)
+    except (TypeError, ValueError):
+        age = None
+
+    return {
+        "output_id": str(output_id),
+        "user_name": user_name,
+        "created_at": created_at,
+        "age": age,
+        "home_country": find_answer(normalized_user, "home country"),
+    }
+
+
+def normalize_audit_rows(output_id, audit_table: list) -> list:
+    """
+    Flatten an audit_table blob into (output_id, trip, rank, score, tier, pb_sd, continent) rows.
+
+    Rows without a trip title are skipped; rank stays the row's position in the blob.
+    """
+    rows = []
+    for rank, trip in enumerate(audit_table, start=1):
+        title = (trip.get("title") or trip.get("trip_title")) if isinstance(trip, dict) else None
+        if not title:
+            print(f"⚠️ Skipping audit row {rank} for output {output_id}: no trip title")
+            continue
+
+        score = trip.get("score")
+        if score is None:
+            score = trip.get("normalized_score")
+
+        rows.append({
+            "output_id": str(output_id),
+            "trip": title,
+            "rank": rank,
+            "score": score,
+            "tier": None if trip.get("tier") is None else str(trip.get("tier")),
+            "pb_sd": trip.get("pb_sd"),
+            "continent": trip.get("continent"),
+        })
+    return rows
+
+
+def _after_key(row: dict) -> str:
+    """
+    PostgREST or=() filter for rows after `row` in (created_at NULLS FIRST, output_id, rank) order.
+    """
+    output_id = json.dumps(str(row["output_id"]))
+    if row.get("created_at") is None:
+        later, same = "created_at.not.is.null", "created_at.is.null"
+    else:
+        created_at = json.dumps(row["created_at"])
+        later, same = f"created_at.gt.{created_at}", f"created_at.eq.{created_at}"
+    return (
+        f"{later},"
+        f"and({same},output_id.gt.{output_id}),"
+        f"and({same},output_id.eq.{output_id},rank.gt.{int(row['rank'])})"
+    )
+
+
+class SQLiteAuditStore:
+    """
+    Local, offline copy of the normalized audit rows.
+    """
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SQLITE_SCHEMA)
+
+    def add_output(self, output: dict, rows: list):
+        with self.conn:
+            self.conn.execute("DELETE FROM audit_rows WHERE output_id = ?", (output["output_id"],))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO audit_outputs VALUES "
+                "(:output_id, :user_name, :created_at, :age, :home_country)",
+                output,
+            )
+            self.conn.executemany(
+                "INSERT INTO audit_rows VALUES "
+                "(:output_id, :trip, :rank, :score, :tier, :pb_sd, :continent)",
+                rows,
+            )
+
+    def iter_rows(self, batch_size: int = 1000):
+        """
+        Stream audit rows joined with their output's cohort attributes, by output then rank.
+        """
+        cursor = self.conn.execute(
+            "SELECT o.user_name, o.created_at, o.age, o.home_country, r.* "
+            "FROM audit_rows r JOIN audit_outputs o USING (output_id) "
+            "ORDER BY o.created_at, r.output_id, r.rank"
+        )
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                return
+            for row in batch:
+                yield dict(row)
+
+    def save_aggregates(self, aggregates: list):
+        with self.conn:
+            self.conn.execute("DELETE FROM cohort_aggregates")
+            self.conn.executemany(
+                f"INSERT INTO cohort_aggregates VALUES ({', '.join(':' + c for c in AGGREGATE_COLUMNS)})",
+                aggregates,
+            )
+
+    def close(self):
+        self.conn.close()
+
+
+class SupabaseAuditStore:
+    """
+    Normalized audit rows in Supabase (see supabase/migrations).
+    """
+
+    def __init__(self, client, page_size: int = 1000):
+        self.client = client
+        self.page_size = page_size
+
+    def add_output(self, output: dict, rows: list):
+        # Upsert first, then drop ranks that are no longer present, so a failed
+        # write never leaves the output without rows.
+        self.client.table("trip_audit_outputs").upsert(output).execute()
+        stale = self.client.table("trip_audit_rows").delete().eq("output_id", output["output_id"])
+        if rows:
+            self.client.table("trip_audit_rows").upsert(rows, on_conflict="output_id,rank").execute()
+            stale = stale.not_.in_("rank", [r["rank"] for r in rows])
+        stale.execute()
+
+    def iter_rows(self, batch_size: int = None):
+        """
+        Stream trip_audit_export in (created_at, output_id, rank) order, paging by key
+        so each page is an index range scan rather than an ever-growing OFFSET.
+        """
+        batch_size = batch_size or self.page_size
+        last = None
+        while True:
+            query = self.client.table("trip_audit_export").select("*")
+            if last is not None:
+                query = query.or_(_after_key(last))
+            result = (
+                query.order("created_at", nullsfirst=True)
+                .order("output_id")
+                .order("rank")
+                .limit(batch_size)
+                .execute()
+            )
+            batch = result.data or []
+            yield from batch
+            if len(batch) < batch_size:
+                return
+            last = batch[-1]
+
+    def save_aggregates(self, aggregates: list):
+        # Upsert this export's rows, then delete rows left over from earlier exports
+        export_id = uuid.uuid4().hex
+        stamped = [dict(a, export_id=export_id) for a in aggregates]
+        for i in range(0, len(stamped), self.page_size):
+            self.client.table("trip_cohort_aggregates").upsert(
+                stamped[i: i + self.page_size], on_conflict="cohort,trip"
+            ).execute()
+        self.client.table("trip_cohort_aggregates").delete().or_(
+            f"export_id.is.null,export_id.neq.{export_id}"
+        ).execute()
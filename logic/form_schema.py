@@ -0,0 +1,42 @@
+import re
+
+
+def normalize_title(text: str) -> str:
+    """Normalize text for fuzzy matching."""
+    return re.sub(r"[^a-z0-9 ]+", "", text.lower().strip())
+
+
+def index_form_schema(schema_data: dict) -> dict:
+    """
+    Index a Typeform schema once for both conversion steps.
+
+    - fields / title_map / all_titles: title matching (build_ref_text.py)
+    - ref_map / form_id / form_title: payload building (build_user_json.py)
+    """
+    fields = []
+    ref_map = {}
+
+    for f in schema_data.get("fields", []):
+        ref = f.get("ref", "")
+        fields.append({
+            "title": f.get("title", "").strip(),
+            "ref": ref,
+            "type": f.get("type", "text")
+        })
+        if ref:
+            ref_map[ref] = {
+                "id": f.get("id", f"id_{ref[:6]}"),
+                "title": f.get("title", ""),
+                "type": f.get("type", "text"),
+            }
+
+    title_map = {normalize_title(f["title"]): f for f in fields}
+
+    return {
+        "fields": fields,
+        "title_map": title_map,
+        "all_titles": list(title_map.keys()),
+        "ref_map": ref_map,
+        "form_id": schema_data.get("id", "mock_form_001"),
+        "form_title": schema_data.get("title", "Untitled Form"),
+    }
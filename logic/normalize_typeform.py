@@ -63,3 +63,15 @@ def normalize_typeform(tf_json: dict) -> dict:
         "meta": meta,
         "answers": normalized_answers,
     }
+
+
+def find_answer(normalized: dict, title_fragment: str):
+    """
+    Return the value of the first normalized answer whose question title contains
+    `title_fragment` (case-insensitive), or None.
+    """
+    fragment = title_fragment.lower()
+    for ans in normalized.get("answers", []):
+        if fragment in (ans.get("field_title") or "").lower():
+            return ans.get("value")
+    return None
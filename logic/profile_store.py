@@ -0,0 +1,402 @@
+import hashlib
+import json
+import math
+import struct
+import sys
+from array import array
+
+# Binary layout (little-endian):
+#   header   MAGIC, version, schema fingerprint (20 bytes), counts
+#   strings  extra strings interned after the schema seed (u32 length + utf-8)
+#   sigs     answer signatures as 4 x i32 string ids
+#   arrays   offsets, meta (JSON-encoded values), ans_sig, ans_val, ans_kind, numbers
+#   text     per-response strings: u64 count, offsets (count + 1 x i64), utf-8 blob
+MAGIC = b"TRPS"
+VERSION = 3
+HEADER = struct.Struct("<4sH20sIIIQQ")
+
+NONE = -1
+
+# Value kinds
+K_NONE, K_STR, K_FLOAT_INLINE, K_FLOAT, K_INT_INLINE, K_JSON, K_TEXT = range(7)
+
+INT32_MIN, INT32_MAX = -2**31, 2**31 - 1
+
+META_KEYS = ("form_id", "token", "landed_at", "submitted_at", "hidden")
+SIGNATURE_KEYS = ("field_id", "field_title", "field_type", "answer_type")
+ANSWER_TYPES = ("choice", "choices", "number", "text", "boolean", "email", "date", "url")
+
+# Meta values that repeat across profiles go in the string pool; the rest
+# (tokens, timestamps, hidden fields) are per-response and go in the text blob.
+POOLED_META = ("form_id",)
+# Answer types drawn from a small label set; other strings are interned only if already pooled.
+POOLED_ANSWER_TYPES = ("choice", "choices", "boolean")
+
+
+class StringPool:
+    """
+    Append-only string interner; ids are list positions.
+    """
+
+    __slots__ = ("strings", "index")
+
+    def __init__(self, strings=()):
+        self.strings = []
+        self.index = {}
+        for s in strings:
+            self.intern(s)
+
+    def intern(self, s) -> int:
+        if s is None:
+            return NONE
+        sid = self.index.get(s)
+        if sid is None:
+            sid = self.index[s] = len(self.strings)
+            self.strings.append(s)
+        return sid
+
+    def get(self, sid):
+        return None if sid == NONE else self.strings[sid]
+
+    def __len__(self):
+        return len(self.strings)
+
+
+class TextBlob:
+    """
+    Append-only UTF-8 blob for per-response strings; ids index `offsets`.
+
+    Duplicates are found through an open-addressing table of (hash, id) held in
+    flat arrays, so a distinct string costs its bytes plus a few dozen bytes of index
+    rather than a str object and a dict entry. The table is rebuilt lazily.
+    """
+
+    __slots__ = ("data", "offsets", "_hashes", "_ids")
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array("q", [0])
+        self._hashes = None
+        self._ids = None
+
+    def _slot(self, s: str, h: int) -> int:
+        mask = len(self._ids) - 1
+        i = h & mask
+        while True:
+            tid = self._ids[i]
+            if tid == NONE or (self._hashes[i] == h and self.get(tid) == s):
+                return i
+            i = (i + 1) & mask
+
+    def _reindex(self, size: int):
+        if self._ids is None:
+            entries = ((hash(self.get(tid)), tid) for tid in range(len(self)))
+        else:
+            entries = ((h, tid) for h, tid in zip(self._hashes, self._ids) if tid != NONE)
+
+        hashes = array("q", [0]) * size
+        ids = array("i", [NONE]) * size
+        mask = size - 1
+        for h, tid in entries:
+            i = h & mask
+            while ids[i] != NONE:
+                i = (i + 1) & mask
+            hashes[i], ids[i] = h, tid
+        self._hashes, self._ids = hashes, ids
+
+    def add(self, s: str) -> int:
+        if self._ids is None or 2 * (len(self) + 1) > len(self._ids):
+            self._reindex(max(1024, 1 << (2 * (len(self) + 1)).bit_length()))
+        h = hash(s)
+        i = self._slot(s, h)
+        if self._ids[i] == NONE:
+            self.data += s.encode("utf-8")
+            self.offsets.append(len(self.data))
+            self._hashes[i], self._ids[i] = h, len(self) - 1
+        return self._ids[i]
+
+    def get(self, tid: int) -> str:
+        return self.data[self.offsets[tid]: self.offsets[tid + 1]].decode("utf-8")
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+
+def _walk_fields(fields):
+    for f in fields:
+        yield f
+        yield from _walk_fields(f.get("properties", {}).get("fields", []))
+
+
+def compile_form_schema(form_json: dict) -> tuple:
+    """
+    Seed strings for a form: every field id, title, type and choice label
+    (including matrix sub-questions), plus the Typeform answer types.
+
+    Returns (seed_strings, fingerprint); the fingerprint ties stored
+    profiles to the exact seed they were interned against.
+    """
+    seed = StringPool(ANSWER_TYPES)
+    seed.intern(form_json.get("id"))
+    for f in _walk_fields(form_json.get("fields", [])):
+        seed.intern(f.get("id"))
+        seed.intern(f.get("title"))
+        seed.intern(f.get("type"))
+        for choice in f.get("properties", {}).get("choices", []):
+            seed.intern(choice.get("label"))
+
+    fingerprint = hashlib.sha1("\x00".join(seed.strings).encode("utf-8")).digest()
+    return tuple(seed.strings), fingerprint
+
+
+class CompactProfile:
+    """
+    Lightweight view of one profile inside a ProfileStore.
+    """
+
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index: int):
+        self.store = store
+        self.index = index
+
+    def answers(self):
+        return self.store._iter_answers(self.index)
+
+    def value(self, field_id: str):
+        for answer in self.answers():
+            if answer["field_id"] == field_id:
+                return answer["value"]
+        return None
+
+    def to_dict(self) -> dict:
+        return self.store.get(self.index)
+
+
+class ProfileStore:
+    """
+    Column-oriented store of normalize_typeform() profiles.
+
+    Repeated strings (field ids, titles, choice labels) are interned once; per-response
+    strings (free text, tokens, timestamps) go in a deduplicated UTF-8 blob indexed by
+    offset. Each answer is a (signature, value, kind) triple held in flat arrays, where
+    a signature is the interned (field_id, field_title, field_type, answer_type) tuple.
+    """
+
+    def __init__(self, seed_strings: tuple, fingerprint: bytes):
+        self.fingerprint = fingerprint
+        self.seed_size = len(seed_strings)
+        self.pool = StringPool(seed_strings)
+
+        self.signatures = []
+        self._sig_index = {}
+
+        self.offsets = array("q", [0])   # answer range per profile
+        self.meta = array("i")           # len(META_KEYS) pool or text ids per profile
+        self.ans_sig = array("i")
+        self.ans_val = array("i")
+        self.ans_kind = array("B")
+        self.numbers = array("d")
+        self.text = TextBlob()
+
+    @classmethod
+    def for_form(cls, form_json: dict):
+        return cls(*compile_form_schema(form_json))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> CompactProfile:
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return CompactProfile(self, index)
+
+    def __iter__(self):
+        return (CompactProfile(self, i) for i in range(len(self)))
+
+    # === Encoding ===
+    def _signature(self, sig: tuple) -> int:
+        sig_id = self._sig_index.get(sig)
+        if sig_id is None:
+            sig_id = self._sig_index[sig] = len(self.signatures)
+            self.signatures.append(sig)
+        return sig_id
+
+    def _encode_value(self, value, answer_type=None):
+        if value is None:
+            return K_NONE, 0
+        if isinstance(value, str):
+            if answer_type in POOLED_ANSWER_TYPES:
+                return K_STR, self.pool.intern(value)
+            sid = self.pool.index.get(value)
+            return (K_TEXT, self.text.add(value)) if sid is None else (K_STR, sid)
+        if (
+            isinstance(value, float) and value.is_integer() and INT32_MIN <= value <= INT32_MAX
+            and not (value == 0 and math.copysign(1.0, value) < 0)
+        ):
+            # int() would drop the sign of -0.0, so that stays in the numbers array
+            return K_FLOAT_INLINE, int(value)
+        if isinstance(value, float):
+            self.numbers.append(value)
+            return K_FLOAT, len(self.numbers) - 1
+        if type(value) is int and INT32_MIN <= value <= INT32_MAX:
+            return K_INT_INLINE, value
+        return K_JSON, self.text.add(json.dumps(value, ensure_ascii=False))
+
+    def add(self, normalized: dict) -> int:
+        """
+        Append one normalize_typeform() dict; returns its index.
+        """
+        answers = normalized.get("answers", [])
+        for ans in answers:
+            for k in SIGNATURE_KEYS:
+                if not isinstance(ans.get(k), (str, type(None))):
+                    raise TypeError(f"Answer {k} must be a string or None, got {ans.get(k)!r}")
+
+        # Meta values are JSON-encoded so non-string ids/timestamps round-trip too
+        meta = normalized.get("meta", {})
+        for key in META_KEYS:
+            encoded = json.dumps(meta.get(key, {} if key == "hidden" else None), ensure_ascii=False)
+            self.meta.append(self.pool.intern(encoded) if key in POOLED_META else self.text.add(encoded))
+
+        for ans in answers:
+            sig = tuple(self.pool.intern(ans.get(k)) for k in SIGNATURE_KEYS)
+            kind, val = self._encode_value(ans.get("value"), ans.get("answer_type"))
+            self.ans_sig.append(self._signature(sig))
+            self.ans_val.append(val)
+            self.ans_kind.append(kind)
+
+        self.offsets.append(len(self.ans_sig))
+        return len(self) - 1
+
+    # === Decoding ===
+    def _decode_value(self, kind: int, val: int):
+        if kind == K_NONE:
+            return None
+        if kind == K_STR:
+            return self.pool.get(val)
+        if kind == K_FLOAT_INLINE:
+            return float(val)
+        if kind == K_FLOAT:
+            return self.numbers[val]
+        if kind == K_INT_INLINE:
+            return val
+        if kind == K_TEXT:
+            return self.text.get(val)
+        return json.loads(self.text.get(val))
+
+    def _iter_answers(self, index: int):
+        get = self.pool.get
+        for a in range(self.offsets[index], self.offsets[index + 1]):
+            field_id, title, field_type, answer_type = self.signatures[self.ans_sig[a]]
+            yield {
+                "field_id": get(field_id),
+                "field_title": get(title),
+                "field_type": get(field_type),
+                "answer_type": get(answer_type),
+                "value": self._decode_value(self.ans_kind[a], self.ans_val[a]),
+            }
+
+    def get(self, index: int) -> dict:
+        """
+        Rebuild the exact normalize_typeform() dict for one profile.
+        """
+        m = len(META_KEYS) * index
+        meta = {
+            key: json.loads(self.pool.get(tid) if key in POOLED_META else self.text.get(tid))
+            for key, tid in zip(META_KEYS, self.meta[m: m + len(META_KEYS)])
+        }
+        return {"meta": meta, "answers": list(self._iter_answers(index))}
+
+    def scan(self, field_id: str):
+        """
+        Yield (profile index, value) for every answer to `field_id`, without
+        materializing profiles.
+        """
+        sid = self.pool.index.get(field_id)
+        if sid is None:
+            return
+        wanted = {i for i, sig in enumerate(self.signatures) if sig[0] == sid}
+        profile = 0
+        for a, sig_id in enumerate(self.ans_sig):
+            if sig_id in wanted:
+                while self.offsets[profile + 1] <= a:
+                    profile += 1
+                yield profile, self._decode_value(self.ans_kind[a], self.ans_val[a])
+
+    # === Binary format ===
+    def save(self, path):
+        extra = self.pool.strings[self.seed_size:]
+        sigs = array("i", [sid for sig in self.signatures for sid in sig])
+
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(
+                MAGIC, VERSION, self.fingerprint, self.seed_size, len(extra),
+                len(self.signatures), len(self), len(self.ans_sig),
+            ))
+            for s in extra:
+                data = s.encode("utf-8")
+                f.write(struct.pack("<I", len(data)))
+                f.write(data)
+
+            for arr in (sigs, self.offsets, self.meta, self.ans_sig, self.ans_val, self.ans_kind):
+                _write_array(f, arr)
+            f.write(struct.pack("<Q", len(self.numbers)))
+            _write_array(f, self.numbers)
+            f.write(struct.pack("<Q", len(self.text)))
+            _write_array(f, self.text.offsets)
+            f.write(self.text.data)
+
+    @classmethod
+    def load(cls, path, form_json: dict):
+        seed_strings, fingerprint = compile_form_schema(form_json)
+
+        with open(path, "rb") as f:
+            magic, version, stored_fp, seed_size, n_extra, n_sigs, n_profiles, n_answers = (
+                HEADER.unpack(f.read(HEADER.size))
+            )
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a v{VERSION} profile store")
+            if stored_fp != fingerprint or seed_size != len(seed_strings):
+                raise ValueError(f"{path} was written against a different form schema")
+
+            store = cls(seed_strings, fingerprint)
+            for _ in range(n_extra):
+                (length,) = struct.unpack("<I", f.read(4))
+                store.pool.intern(f.read(length).decode("utf-8"))
+
+            sigs = _read_array(f, "i", 4 * n_sigs)
+            store.signatures = [tuple(sigs[i: i + 4]) for i in range(0, len(sigs), 4)]
+            store._sig_index = {sig: i for i, sig in enumerate(store.signatures)}
+
+            store.offsets = _read_array(f, "q", n_profiles + 1)
+            store.meta = _read_array(f, "i", len(META_KEYS) * n_profiles)
+            store.ans_sig = _read_array(f, "i", n_answers)
+            store.ans_val = _read_array(f, "i", n_answers)
+            store.ans_kind = _read_array(f, "B", n_answers)
+            (n_numbers,) = struct.unpack("<Q", f.read(8))
+            store.numbers = _read_array(f, "d", n_numbers)
+            (n_texts,) = struct.unpack("<Q", f.read(8))
+            store.text.offsets = _read_array(f, "q", n_texts + 1)
+            store.text.data = bytearray(f.read(store.text.offsets[-1]))
+            if len(store.text.data) != store.text.offsets[-1]:
+                raise ValueError("Truncated profile store")
+
+        return store
+
+
+def _write_array(f, arr: array):
+    if sys.byteorder == "big":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    f.write(arr.tobytes())
+
+
+def _read_array(f, typecode: str, count: int) -> array:
+    arr = array(typecode)
+    arr.frombytes(f.read(arr.itemsize * count))
+    if len(arr) != count:
+        raise ValueError("Truncated profile store")
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
@@ -0,0 +1,239 @@
+import re
+
+import numpy as np
+
+from logic.normalize_typeform import find_answer
+
+# Modifier weights searched by scripts/calibrate_weights.py, with their search bounds.
+# Tier 1 is the reference multiplier (1.0); everything else is relative to it.
+WEIGHT_BOUNDS = {
+    "tier2_mult": (0.70, 1.00),      # [2] core scaling
+    "pb_mult": (1.00, 1.30),
+    "sd_mult": (0.80, 1.10),
+    "landscape": (20.0, 80.0),       # base fit
+    "culture": (10.0, 60.0),
+    "home_penalty": (0.0, 40.0),     # [1] hard penalties
+    "visited_penalty": (0.0, 40.0),
+    "breadth_bias": (0.0, 20.0),     # [3] regional & cultural
+    "adjacency": (0.0, 15.0),
+    "soft_cap": (0.70, 1.00),        # [4] balance passes
+    "diversity_boost": (0.0, 20.0),  # [5] finalization
+}
+
+WEIGHT_NAMES = list(WEIGHT_BOUNDS)
+
+DEFAULT_WEIGHTS = {
+    "tier2_mult": 0.85,
+    "pb_mult": 1.10,
+    "sd_mult": 1.00,
+    "landscape": 50.0,
+    "culture": 30.0,
+    "home_penalty": 20.0,
+    "visited_penalty": 15.0,
+    "breadth_bias": 5.0,
+    "adjacency": 3.0,
+    "soft_cap": 0.90,
+    "diversity_boost": 10.0,
+}
+
+# §4 soft-caps (Europe ≤ 3; others ≤ 2) and diversity floor
+CONTINENT_CAPS = {"Europe": 3}
+DEFAULT_CONTINENT_CAP = 2
+DIVERSITY_TOP_N = 8
+DIVERSITY_MIN_CONTINENTS = 3
+
+# Survey landscape labels start with these words
+LANDSCAPE_KEYS = {
+    "beaches": "beaches",
+    "mountains": "mountains",
+    "lakes": "lakes",
+    "forests": "forests",
+    "vineyards": "vineyards",
+    "wildlife": "wildlife",
+    "rainforests": "rainforests",
+    "deserts": "deserts",
+}
+
+# Catalog continent -> keyword in the "Which of the 7 continents have you visited" answer
+SURVEY_CONTINENTS = {
+    "Europe": "europe",
+    "Asia": "asia",
+    "Asia/Africa": "asia",
+    "Africa": "africa",
+    "North America": "north america",
+    "Central America": "north america",
+    "South America": "south america",
+    "Oceania": "oceania",
+}
+
+COUNTRY_ALIASES = {
+    "usa": "United States",
+    "us": "United States",
+    "united states of america": "United States",
+    "uk": "United Kingdom",
+    "england": "United Kingdom",
+}
+
+CULTURE_LEVELS = [
+    ("really interested", 1.0),
+    ("somewhat interested", 0.6),
+    ("not that interested", 0.2),
+]
+
+
+def _canonical_country(name: str) -> str:
+    name = name.strip()
+    return COUNTRY_ALIASES.get(name.lower(), name)
+
+
+def extract_profile_features(normalized_user: dict) -> dict:
+    """
+    Pull the inputs the scoring model uses out of a normalize_typeform() profile.
+    """
+    landscapes = {}
+    raw = find_answer(normalized_user, "What kind of landscapes") or ""
+    for label, rating in re.findall(r"([A-Za-z][A-Za-z ,]*?)\s+(\d+)", raw):
+        key = LANDSCAPE_KEYS.get(label.split(",")[0].split()[0].lower())
+        if key:
+            landscapes[key] = float(rating)
+
+    culture_raw = (find_answer(normalized_user, "history and culture") or "").lower()
+    culture = next((level for phrase, level in CULTURE_LEVELS if phrase in culture_raw), 0.5)
+
+    visited_text = " ".join(
+        str(ans.get("value") or "")
+        for ans in normalized_user.get("answers", [])
+        if (ans.get("field_title") or "").startswith("Where have you traveled")
+    )
+    continents_text = (find_answer(normalized_user, "continents have you visited") or "").lower()
+
+    return {
+        "landscapes": landscapes,
+        "culture": culture,
+        "home_country": _canonical_country(find_answer(normalized_user, "home country") or ""),
+        "visited_text": visited_text,
+        "continents_text": continents_text,
+    }
+
+
+def build_trip_tables(trip_catalog: list, trip_features: dict) -> dict:
+    """
+    Static per-trip arrays shared by every user and weight configuration.
+    """
+    titles = [t["title"] for t in trip_catalog]
+    continents = sorted({t["continent"] for t in trip_catalog})
+    cont_idx = np.array([continents.index(t["continent"]) for t in trip_catalog])
+    countries = [set(trip_features[title]["countries"]) for title in titles]
+
+    n = len(titles)
+    adjacent = np.array([
+        [i != j and bool(countries[i] & countries[j]) for j in range(n)]
+        for i in range(n)
+    ])
+
+    return {
+        "titles": titles,
+        "continents": continents,
+        "cont_idx": cont_idx,
+        "cont_onehot": np.eye(len(continents), dtype=bool)[cont_idx],
+        "same_continent": cont_idx[:, None] == cont_idx[None, :],
+        "adjacent": adjacent,
+        "caps": np.array([CONTINENT_CAPS.get(c, DEFAULT_CONTINENT_CAP) for c in continents]),
+        "tier2": np.array([t["tier"] == 2 for t in trip_catalog]),
+        "pb": np.array([t["pb_sd"] == "PB" for t in trip_catalog]),
+        "cultural_depth": np.array([t["cultural_depth"] / 10 for t in trip_catalog]),
+        "countries": countries,
+        "landscapes": [trip_features[title]["landscapes"] for title in titles],
+    }
+
+
+def build_user_tables(profiles: list, trips: dict) -> dict:
+    """
+    Per-user feature matrices, each shaped [users, trips].
+    """
+    landscape, culture, home, visited, new_continent = [], [], [], [], []
+
+    for p in profiles:
+        landscape.append([
+            np.mean([p["landscapes"].get(k, 0.0) for k in keys]) / 10 if keys else 0.0
+            for keys in trips["landscapes"]
+        ])
+        culture.append(p["culture"] * trips["cultural_depth"])
+        home.append([p["home_country"] in countries for countries in trips["countries"]])
+        visited.append([
+            sum(c in p["visited_text"] for c in countries) / len(countries)
+            for countries in trips["countries"]
+        ])
+        new_continent.append([
+            SURVEY_CONTINENTS[trips["continents"][ci]] not in p["continents_text"]
+            for ci in trips["cont_idx"]
+        ])
+
+    return {
+        "landscape": np.array(landscape, dtype=float),
+        "culture": np.array(culture, dtype=float),
+        "home": np.array(home, dtype=float),
+        "visited": np.array(visited, dtype=float),
+        "new_continent": np.array(new_continent, dtype=float),
+    }
+
+
+def weights_to_matrix(weight_dicts: list) -> np.ndarray:
+    return np.array([[w[name] for name in WEIGHT_NAMES] for w in weight_dicts], dtype=float)
+
+
+def _higher(scores: np.ndarray) -> np.ndarray:
+    # higher[..., t, u] is True when trip u outscores trip t
+    return scores[..., None, :] > scores[..., :, None]
+
+
+def score_batch(weights: np.ndarray, users: dict, trips: dict) -> np.ndarray:
+    """
+    Apply the §6 modifier precedence for a batch of weight configurations.
+
+    weights: [configs, len(WEIGHT_NAMES)]
+    returns: normalized final scores, [configs, users, trips]
+    """
+    w = {name: weights[:, i][:, None, None] for i, name in enumerate(WEIGHT_NAMES)}
+
+    # Base fit
+    scores = w["landscape"] * users["landscape"] + w["culture"] * users["culture"]
+
+    # [1] Hard penalties: Home, Visited / Familiarity Smoothing
+    scores = scores - w["home_penalty"] * users["home"] - w["visited_penalty"] * users["visited"]
+
+    # [2] Core scaling: Tier → PB → SD
+    tier = np.where(trips["tier2"], w["tier2_mult"], 1.0)
+    pb_sd = np.where(trips["pb"], w["pb_mult"], w["sd_mult"])
+    scores = scores * tier * pb_sd
+
+    # [3] Regional: breadth toward unvisited continents, dampen trips adjacent to higher-ranked ones
+    higher = _higher(scores)
+    adjacent_above = (higher & trips["adjacent"]).sum(-1)
+    scores = scores + w["breadth_bias"] * users["new_continent"] - w["adjacency"] * adjacent_above
+
+    # [4] Soft-cap: trips beyond their continent's cap are scaled down
+    higher = _higher(scores)
+    continent_rank = (higher & trips["same_continent"]).sum(-1) + 1
+    over_cap = continent_rank > trips["caps"][trips["cont_idx"]]
+    scores = np.where(over_cap, scores * w["soft_cap"], scores)
+
+    # [5] Diversity floor: boost the best trip of each missing continent
+    higher = _higher(scores)
+    in_top = higher.sum(-1) < DIVERSITY_TOP_N
+    present = (in_top[..., None] & trips["cont_onehot"]).any(-2)
+    missing = ~present & (present.sum(-1) < DIVERSITY_MIN_CONTINENTS)[..., None]
+    best_of_continent = ((higher & trips["same_continent"]).sum(-1) == 0)
+    scores = scores + w["diversity_boost"] * (missing[..., trips["cont_idx"]] & best_of_continent)
+
+    # Normalize to 100
+    top = scores.max(-1, keepdims=True)
+    return 100 * scores / np.where(top > 0, top, 1.0)
+
+
+def rank_positions(scores: np.ndarray) -> np.ndarray:
+    """
+    1-based rank of every trip, ties broken by catalog order.
+    """
+    order = np.argsort(-scores, axis=-1, kind="stable")
+    return np.argsort(order, axis=-1, kind="stable") + 1
@@ -0,0 +1,80 @@
+import hashlib
+import json
+
+
+def _score(trip: dict):
+    score = trip.get("score")
+    return trip.get("normalized_score") if score is None else score
+
+
+def _title(trip: dict):
+    return trip.get("title") or trip.get("trip_title")
+
+
+def _card(trip: dict) -> dict:
+    return {
+        "title": _title(trip),
+        "score": _score(trip),
+        "rationale": trip.get("rationale"),
+    }
+
+
+def _audit_row(trip: dict, rank: int) -> dict:
+    return {
+        "rank": rank,
+        "title": _title(trip),
+        "score": _score(trip),
+        "tier": trip.get("tier"),
+        "pb_sd": trip.get("pb_sd"),
+        "continent": trip.get("continent"),
+    }
+
+
+def encode(payload) -> tuple:
+    """
+    Serialize a payload once and derive its strong ETag from the bytes.
+    """
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+    return body, etag
+
+
+def project_output(row: dict) -> dict:
+    """
+    Split a trip_outputs row into the compact pieces the output viewer needs.
+
+    - summary: list entry (id, user, timestamp, Top 8 titles + scores, no rationales)
+    - detail: Top 8 + Next 5 cards with rationales, no audit rows
+    - audit: the ranked audit rows, served separately so they load lazily
+    """
+    final_json = row.get("final_json") or {}
+    top8 = row.get("top8") or final_json.get("top_8") or []
+    next5 = row.get("next5") or final_json.get("next_5") or []
+    audit = row.get("audit_table") or final_json.get("audit_table") or []
+
+    output_id = str(row.get("id"))
+    header = {
+        "id": output_id,
+        "user_name": row.get("user_name"),
+        "created_at": row.get("created_at"),
+    }
+
+    summary = dict(header)
+    summary["top_8"] = [{"title": _title(t), "score": _score(t)} for t in top8]
+    summary["audit_count"] = len(audit)
+
+    detail = dict(header)
+    detail["top_8"] = [_card(t) for t in top8]
+    detail["next_5"] = [_card(t) for t in next5]
+    detail["audit_count"] = len(audit)
+
+    audit_payload = {
+        "id": output_id,
+        "audit_table": [_audit_row(t, i) for i, t in enumerate(audit, start=1)],
+    }
+
+    return {
+        "summary": summary,
+        "detail": encode(detail),
+        "audit": encode(audit_payload),
+    }
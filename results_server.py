@@ -0,0 +1,247 @@
+"""
+results_server.py
+-----------------
+Small local results API for output_viewer.html.
+
+Precomputes a compact projection of every trip_outputs row once (see
+logic/results_projection.py) and serves it with ETag / If-None-Match caching:
+
+    GET /outputs?user=<name>&limit=20&offset=0   paginated summaries, newest first
+    GET /outputs/<id>                            Top 8 + Next 5 with rationales
+    GET /outputs/<id>/audit                      full audit table (loaded lazily)
+
+Usage:
+    python results_server.py                         # rows from Supabase trip_outputs
+    python results_server.py --local .               # output_*.json files in a directory
+    python results_server.py --port 8765 --refresh 60
+"""
+
+import argparse
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from logic.results_projection import encode, project_output
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+SUPABASE_PAGE_SIZE = 500
+
+
+class ResultsStore:
+    """
+    In-memory index of projected outputs, newest first.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_id = {}
+        self._order = []
+        self.latest_created_at = None
+
+    def add_rows(self, rows):
+        projected = [project_output(row) for row in rows]
+        if not projected:
+            return 0
+
+        with self._lock:
+            added = sum(p["summary"]["id"] not in self._by_id for p in projected)
+            for p in projected:
+                self._by_id[p["summary"]["id"]] = p
+            self._order = sorted(
+                self._by_id.values(),
+                key=lambda p: p["summary"]["created_at"] or "",
+                reverse=True,
+            )
+            self.latest_created_at = self._order[0]["summary"]["created_at"]
+        return added
+
+    def get(self, output_id):
+        return self._by_id.get(output_id)
+
+    def list(self, user=None, limit=DEFAULT_LIMIT, offset=0):
+        order = self._order
+        if user:
+            user = user.strip().lower()
+            order = [p for p in order if (p["summary"]["user_name"] or "").lower() == user]
+
+        page = order[offset: offset + limit]
+        return {
+            "total": len(order),
+            "limit": limit,
+            "offset": offset,
+            "items": [p["summary"] for p in page],
+        }
+
+
+# === Sources ===
+def fetch_supabase_rows(since=None):
+    """
+    Page through trip_outputs (optionally only rows at or after `since`).
+
+    id breaks created_at ties so pages never skip or repeat rows; `since` is
+    inclusive because rows sharing the last timestamp may arrive later, and
+    ResultsStore dedupes by id.
+    """
+    from supabase_client import supabase
+
+    rows = []
+    start = 0
+    while True:
+        query = supabase.table("trip_outputs").select(
+            "id, user_name, created_at, top8, next5, audit_table"
+        )
+        if since:
+            query = query.gte("created_at", since)
+        result = (
+            query.order("created_at")
+            .order("id")
+            .range(start, start + SUPABASE_PAGE_SIZE - 1)
+            .execute()
+        )
+
+        batch = result.data or []
+        rows.extend(batch)
+        if len(batch) < SUPABASE_PAGE_SIZE:
+            return rows
+        start += SUPABASE_PAGE_SIZE
+
+
+def load_local_rows(directory: Path):
+    """
+    Read output_*.json files written by run_local.py.
+    """
+    rows = []
+    for path in sorted(directory.glob("output_*.json")):
+        base_name = path.stem[len("output_"):]
+        with open(path, "r") as f:
+            final_json = json.load(f)
+        rows.append({
+            "id": base_name,
+            "user_name": base_name.replace("_", " ").replace("-", " ").title(),
+            "created_at": datetime.fromtimestamp(path.stat().st_mtime, timezone.utc).isoformat(),
+            "final_json": final_json,
+        })
+    return rows
+
+
+# === HTTP ===
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match, etag: str) -> bool:
+    """
+    If-None-Match uses weak comparison (RFC 9110 §13.1.2): W/ prefixes are ignored and * matches anything.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(_opaque_tag(t) == _opaque_tag(etag) for t in if_none_match.split(","))
+
+
+def make_handler(store: ResultsStore):
+
+    class ResultsHandler(BaseHTTPRequestHandler):
+
+        def _send(self, status, body=b"", etag=None):
+            self.send_response(status)
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.send_header("Access-Control-Expose-Headers", "ETag")
+            self.send_header("Cache-Control", "no-cache")
+            if etag:
+                self.send_header("ETag", etag)
+            if body:
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        def _send_cached(self, body, etag):
+            if etag_matches(self.headers.get("If-None-Match"), etag):
+                self._send(304, etag=etag)
+            else:
+                self._send(200, body, etag)
+
+        def _send_error(self, status, message):
+            body, _ = encode({"error": message})
+            self._send(status, body)
+
+        def do_OPTIONS(self):
+            self.send_response(204)
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.send_header("Access-Control-Allow-Headers", "If-None-Match")
+            self.end_headers()
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = [p for p in url.path.split("/") if p]
+
+            if parts == ["outputs"]:
+                query = parse_qs(url.query)
+                try:
+                    limit = min(int(query.get("limit", [DEFAULT_LIMIT])[0]), MAX_LIMIT)
+                    offset = max(int(query.get("offset", [0])[0]), 0)
+                except ValueError:
+                    return self._send_error(400, "limit and offset must be integers")
+                if limit < 1:
+                    return self._send_error(400, "limit must be positive")
+
+                page = store.list(query.get("user", [None])[0], limit, offset)
+                return self._send_cached(*encode(page))
+
+            if len(parts) in (2, 3) and parts[0] == "outputs":
+                projected = store.get(parts[1])
+                if projected is None:
+                    return self._send_error(404, f"Unknown output: {parts[1]}")
+                if len(parts) == 2:
+                    return self._send_cached(*projected["detail"])
+                if parts[2] == "audit":
+                    return self._send_cached(*projected["audit"])
+
+            self._send_error(404, "Not found")
+
+    return ResultsHandler
+
+
+def refresh_loop(store: ResultsStore, interval: int):
+    while True:
+        time.sleep(interval)
+        try:
+            added = store.add_rows(fetch_supabase_rows(since=store.latest_created_at))
+            if added:
+                print(f"Synced {added} new trip_outputs rows")
+        except Exception as e:
+            print(f"Refresh failed: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve compact trip_outputs projections for the output viewer")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--local", help="Directory of output_*.json files to serve instead of Supabase")
+    parser.add_argument("--refresh", type=int, default=0, help="Seconds between Supabase syncs (0 = off)")
+    args = parser.parse_args()
+
+    store = ResultsStore()
+    if args.local:
+        loaded = store.add_rows(load_local_rows(Path(args.local)))
+    else:
+        loaded = store.add_rows(fetch_supabase_rows())
+        if args.refresh > 0:
+            threading.Thread(target=refresh_loop, args=(store, args.refresh), daemon=True).start()
+
+    print(f"Projected {loaded} outputs")
+    print(f"Serving on http://{args.host}:{args.port}/outputs")
+    ThreadingHTTPServer((args.host, args.port), make_handler(store)).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
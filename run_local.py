@@ -251,6 +251,20 @@ Return ONLY JSON, no prose.
     output_id = output_insert.data[0]["id"]
     print(f"Inserted trip_outputs row: {output_id}")
 
+    # Normalized audit rows for analytics (see scripts/export_output2.py)
+    from logic.audit_store import SupabaseAuditStore, normalize_audit_rows, output_record
+
+    try:
+        audit_rows = normalize_audit_rows(output_id, audit)
+        SupabaseAuditStore(supabase).add_output(
+            output_record(output_id, user_name, output_insert.data[0].get("created_at"), normalized_user),
+            audit_rows,
+        )
+        print(f"Inserted {len(audit_rows)} trip_audit_rows")
+    except Exception as e:
+        # trip_outputs is already saved; rows can be rebuilt with export_output2.py --backfill
+        print(f"Failed to write trip_audit_rows for {output_id}: {e}")
+
 
     # Print a quick summary to console if keys exist
     top8 = output_json.get("top_8") or output_json.get("top8") or []
@@ -12,28 +12,20 @@ Usage:
         --output data/users/corinne_ref_aligned.txt
 """
 
-import json, re, argparse, difflib
+import json, re, argparse, difflib, sys
 from pathlib import Path
 
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
 
-# === Utility ===
-def normalize(text: str) -> str:
-    """Normalize text for fuzzy matching."""
-    return re.sub(r"[^a-z0-9 ]+", "", text.lower().strip())
+from logic.form_schema import index_form_schema, normalize_title as normalize
 
 
 # === Load Schema ===
 def load_schema(form_path: Path):
-    data = json.loads(form_path.read_text(encoding="utf-8"))
-    fields = []
-    for f in data.get("fields", []):
-        fields.append({
-            "title": f.get("title", "").strip(),
-            "ref": f.get("ref", ""),
-            "type": f.get("type", "text")
-        })
-    print(f"📋 Loaded {len(fields)} questions from {form_path.name}")
-    return fields
+    index = index_form_schema(json.loads(form_path.read_text(encoding="utf-8")))
+    print(f"📋 Loaded {len(index['fields'])} questions from {form_path.name}")
+    return index
 
 
 # === Parse Responses ===
@@ -53,22 +45,19 @@ def parse_text_responses(text_path: Path):
 
 
 # === Matching ===
-def match_questions(qa_pairs, fields):
-    schema_map = {normalize(f["title"]): f for f in fields}
-    all_titles = list(schema_map.keys())
-
+def match_questions(qa_pairs, title_map, all_titles):
     matched = []
     unmatched = []
 
     for question, answer in qa_pairs:
         norm_q = normalize(question)
-        if norm_q in schema_map:
-            field = schema_map[norm_q]
+        if norm_q in title_map:
+            field = title_map[norm_q]
             match_type = "EXACT"
         else:
             match = difflib.get_close_matches(norm_q, all_titles, n=1, cutoff=0.45)
             if match:
-                field = schema_map[match[0]]
+                field = title_map[match[0]]
                 match_type = "FUZZY"
             else:
                 unmatched.append((question, answer))
@@ -104,9 +93,9 @@ def main():
     parser.add_argument("--output", required=True, help="Path to output text file")
     args = parser.parse_args()
 
-    fields = load_schema(Path(args.form))
+    index = load_schema(Path(args.form))
     qa_pairs = parse_text_responses(Path(args.input))
-    matched, unmatched = match_questions(qa_pairs, fields)
+    matched, unmatched = match_questions(qa_pairs, index["title_map"], index["all_titles"])
 
     export_text(matched, Path(args.output))
 
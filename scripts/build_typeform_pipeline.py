@@ -0,0 +1,125 @@
+"""
+build_typeform_pipeline.py
+--------------------------
+Converts cleaned survey text responses straight into Typeform-style webhook JSON,
+fusing build_ref_text.py and build_user_json.py into one in-memory pass:
+  - the schema is loaded and indexed once (title index + ref map)
+  - every *_text_response.txt in a users/ directory is processed across a process pool
+  - the intermediate *_ref_aligned.txt is only written when --write-text is given
+
+The resulting payloads match the two-step flow (apart from the generated timestamps).
+
+Usage:
+    python scripts/build_typeform_pipeline.py \
+        --form data/macro_survey_pretty.json \
+        --input data/typeform_responses/users \
+        --output data/typeform_responses \
+        [--write-text] [--workers 4]
+"""
+
+import json, argparse, sys
+from pathlib import Path
+from multiprocessing import Pool
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from logic.form_schema import index_form_schema
+from scripts.build_ref_text import parse_text_responses, match_questions, export_text
+from scripts.build_user_json import build_typeform_json
+
+
+TEXT_SUFFIX = "_text_response.txt"
+
+
+# === Load + Index Schema (once) ===
+def load_schema_index(form_path: Path):
+    """Build everything both steps need from the schema in a single read."""
+    index = index_form_schema(json.loads(form_path.read_text(encoding="utf-8")))
+    print(f"📋 Indexed {len(index['ref_map'])} fields from {form_path.name}")
+    return index
+
+
+# === Single Response ===
+def convert_response(text_path: Path, index, output_dir: Path, write_text: bool = False):
+    """Text response → Typeform JSON without re-parsing an intermediate file."""
+    user = text_path.name[: -len(TEXT_SUFFIX)] if text_path.name.endswith(TEXT_SUFFIX) else text_path.stem
+
+    qa_pairs = parse_text_responses(text_path)
+    matched, unmatched = match_questions(qa_pairs, index["title_map"], index["all_titles"])
+
+    if write_text:
+        export_text(matched, text_path.with_name(f"{user}_ref_aligned.txt"))
+
+    entries = [
+        {"ref": m["question_ref"], "question": m["question"], "answer": m["answer"]}
+        for m in matched
+    ]
+    payload = build_typeform_json(entries, index["ref_map"], index["form_id"], index["form_title"])
+
+    out_path = output_dir / f"{user}_response_true.json"
+    out_path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+    return out_path, [q for q, _ in unmatched]
+
+
+# === Process Pool ===
+_worker_index = None
+
+
+def _init_worker(index):
+    global _worker_index
+    _worker_index = index
+
+
+def _convert_job(job):
+    text_path, output_dir, write_text = job
+    return convert_response(text_path, _worker_index, output_dir, write_text)
+
+
+def convert_directory(input_dir: Path, index, output_dir: Path, write_text: bool = False, workers=None):
+    text_paths = sorted(input_dir.glob(f"*{TEXT_SUFFIX}"))
+    if not text_paths:
+        print(f"⚠️ No *{TEXT_SUFFIX} files found in {input_dir}")
+        return []
+
+    jobs = [(p, output_dir, write_text) for p in text_paths]
+    if workers == 1 or len(jobs) == 1:
+        _init_worker(index)
+        return [_convert_job(job) for job in jobs]
+
+    with Pool(processes=workers, initializer=_init_worker, initargs=(index,)) as pool:
+        return pool.map(_convert_job, jobs)
+
+
+# === Main ===
+def main():
+    parser = argparse.ArgumentParser(description="Convert text responses to Typeform-style JSON in one pass")
+    parser.add_argument("--form", required=True, help="Path to macro_survey_pretty.json")
+    parser.add_argument("--input", required=True, help="A *_text_response.txt file or a users/ directory")
+    parser.add_argument("--output", required=True, help="Directory to save JSON output")
+    parser.add_argument("--write-text", action="store_true", help="Also write the *_ref_aligned.txt files")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    args = parser.parse_args()
+
+    index = load_schema_index(Path(args.form))
+    input_path = Path(args.input)
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if input_path.is_dir():
+        results = convert_directory(input_path, index, output_dir, args.write_text, args.workers)
+    else:
+        results = [convert_response(input_path, index, output_dir, args.write_text)]
+
+    for out_path, unmatched in results:
+        print(f"\n🎉 Typeform JSON saved → {out_path}")
+        if unmatched:
+            print(f"⚠️ Unmatched ({len(unmatched)}):")
+            for q in unmatched[:5]:
+                print(f"   - {q[:80]}")
+            if len(unmatched) > 5:
+                print("   ...")
+
+
+if __name__ == "__main__":
+    main()
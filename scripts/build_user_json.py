@@ -12,29 +12,21 @@ Usage:
         --output data/users/corinne_response_true.json
 """
 
-import json, re, argparse
+import json, re, argparse, sys
 from pathlib import Path
 from datetime import datetime
 
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from logic.form_schema import index_form_schema
+
 
 # === Load Schema ===
 def load_schema(form_path: Path):
-    schema_data = json.loads(form_path.read_text(encoding="utf-8"))
-    ref_map = {}
-    form_id = schema_data.get("id", "mock_form_001")
-    title = schema_data.get("title", "Untitled Form")
-
-    for field in schema_data.get("fields", []):
-        ref = field.get("ref")
-        if ref:
-            ref_map[ref] = {
-                "id": field.get("id", f"id_{ref[:6]}"),
-                "title": field.get("title", ""),
-                "type": field.get("type", "text"),
-            }
-
-    print(f"📋 Loaded {len(ref_map)} fields from {form_path.name}")
-    return ref_map, form_id, title
+    index = index_form_schema(json.loads(form_path.read_text(encoding="utf-8")))
+    print(f"📋 Loaded {len(index['ref_map'])} fields from {form_path.name}")
+    return index["ref_map"], index["form_id"], index["form_title"]
 
 
 # === Parse ref-aligned text file ===
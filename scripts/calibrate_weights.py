@@ -0,0 +1,179 @@
+"""
+calibrate_weights.py
+--------------------
+Searches the TransferKit modifier weight space (Tier/PB/SD multipliers, adjacency,
+soft-cap, diversity boost, ...) for the configuration that best reproduces the
+§9 reference Top 13 sets for Corinne and Sasha.
+
+Weight configurations are scored in batches with the vectorized model in
+logic/recommender_engine.py: a random sweep over WEIGHT_BOUNDS, then rounds of
+local refinement around the best configuration found so far.
+
+Usage:
+    python scripts/calibrate_weights.py \
+        --reference data/reference_top13.json \
+        --output data/calibrated_weights.json \
+        [--batches 40] [--batch-size 2048] [--seed 7]
+"""
+
+import json, argparse, sys, time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from logic.normalize_typeform import normalize_typeform
+from logic.recommender_engine import (
+    WEIGHT_BOUNDS, WEIGHT_NAMES, DEFAULT_WEIGHTS,
+    extract_profile_features, build_trip_tables, build_user_tables,
+    weights_to_matrix, score_batch, rank_positions,
+)
+
+TOP_N = 13
+MISS_PENALTY = 3
+
+
+# === Load Inputs ===
+def load_inputs(reference_path: Path, catalog_path: Path, features_path: Path):
+    reference = json.loads(reference_path.read_text(encoding="utf-8"))
+    catalog = json.loads(catalog_path.read_text(encoding="utf-8"))
+    features = json.loads(features_path.read_text(encoding="utf-8"))
+
+    trips = build_trip_tables(catalog, features)
+
+    users, profiles, ref_ranks = [], [], []
+    for name, ref in reference["users"].items():
+        tf_json = json.loads((ROOT / ref["response"]).read_text(encoding="utf-8"))
+        profiles.append(extract_profile_features(normalize_typeform(tf_json)))
+
+        ranks = np.zeros(len(trips["titles"]), dtype=int)
+        for rank, title in enumerate(ref["top_13"], start=1):
+            ranks[trips["titles"].index(title)] = rank
+        users.append(name)
+        ref_ranks.append(ranks)
+
+    print(f"📋 Loaded {len(trips['titles'])} trips and {len(users)} reference users")
+    return users, trips, build_user_tables(profiles, trips), np.array(ref_ranks)
+
+
+# === Objective ===
+def batch_loss(ranks: np.ndarray, ref_ranks: np.ndarray) -> np.ndarray:
+    """
+    Sum of |Δrank| over every reference Top 13 trip, plus a penalty per trip
+    that falls out of the predicted Top 13. ranks: [configs, users, trips]
+    """
+    in_ref = ref_ranks > 0
+    delta = np.minimum(np.abs(ranks - ref_ranks), TOP_N) * in_ref
+    misses = (ranks > TOP_N) & in_ref
+    return delta.sum((-1, -2)) + MISS_PENALTY * misses.sum((-1, -2))
+
+
+def evaluate(weights, users_t, trips, ref_ranks):
+    scores = score_batch(weights, users_t, trips)
+    return batch_loss(rank_positions(scores), ref_ranks), scores
+
+
+# === Search ===
+def sample_uniform(rng, n):
+    low = np.array([WEIGHT_BOUNDS[k][0] for k in WEIGHT_NAMES])
+    high = np.array([WEIGHT_BOUNDS[k][1] for k in WEIGHT_NAMES])
+    return rng.uniform(low, high, size=(n, len(WEIGHT_NAMES)))
+
+
+def sample_around(rng, center, n, spread):
+    low = np.array([WEIGHT_BOUNDS[k][0] for k in WEIGHT_NAMES])
+    high = np.array([WEIGHT_BOUNDS[k][1] for k in WEIGHT_NAMES])
+    samples = center + rng.normal(0, spread * (high - low), size=(n, len(WEIGHT_NAMES)))
+    return np.clip(samples, low, high)
+
+
+def search(users_t, trips, ref_ranks, batches, batch_size, seed):
+    rng = np.random.default_rng(seed)
+
+    best = weights_to_matrix([DEFAULT_WEIGHTS])
+    best_loss = evaluate(best, users_t, trips, ref_ranks)[0][0]
+
+    evaluated = 1
+    started = time.perf_counter()
+    for b in range(batches):
+        # First half sweeps the whole space, second half refines with a shrinking radius
+        if b < batches // 2:
+            candidates = sample_uniform(rng, batch_size)
+        else:
+            progress = (b - batches // 2) / max(batches - batches // 2, 1)
+            candidates = sample_around(rng, best[0], batch_size, 0.15 * (1 - progress) + 0.01)
+
+        losses = evaluate(candidates, users_t, trips, ref_ranks)[0]
+        evaluated += len(candidates)
+
+        i = int(np.argmin(losses))
+        if losses[i] < best_loss:
+            best_loss, best = losses[i], candidates[i:i + 1]
+            print(f"   batch {b + 1:>3}: loss {best_loss}")
+
+    elapsed = time.perf_counter() - started
+    print(f"⚙️  Evaluated {evaluated} configurations in {elapsed:.1f}s ({evaluated / elapsed:,.0f}/s)")
+    return best, int(best_loss)
+
+
+# === Report ===
+def build_report(best, best_loss, users, users_t, trips, ref_ranks):
+    scores = score_batch(best, users_t, trips)[0]
+    ranks = rank_positions(scores)
+
+    per_user = {}
+    for u, name in enumerate(users):
+        rows = []
+        for t in np.argsort(ref_ranks[u] + (ref_ranks[u] == 0) * 1000):
+            if ref_ranks[u][t] == 0:
+                break
+            rows.append({
+                "title": trips["titles"][t],
+                "ref_rank": int(ref_ranks[u][t]),
+                "rank": int(ranks[u][t]),
+                "delta": int(ranks[u][t] - ref_ranks[u][t]),
+                "score": round(float(scores[u][t]), 1),
+            })
+        per_user[name] = {
+            "exact_matches": sum(r["delta"] == 0 for r in rows),
+            "within_1": sum(abs(r["delta"]) <= 1 for r in rows),
+            "in_top_13": sum(r["rank"] <= TOP_N for r in rows),
+            "trips": rows,
+        }
+
+    return {
+        "weights": {name: round(float(v), 4) for name, v in zip(WEIGHT_NAMES, best[0])},
+        "loss": best_loss,
+        "reference": per_user,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate TransferKit modifier weights against §9 reference Top 13 sets")
+    parser.add_argument("--reference", default="data/reference_top13.json", help="Reference Top 13 JSON")
+    parser.add_argument("--catalog", default="data/trip_catalog.json", help="Trip catalog JSON")
+    parser.add_argument("--features", default="data/trip_features.json", help="Per-trip countries/landscapes JSON")
+    parser.add_argument("--output", default="data/calibrated_weights.json", help="Where to save the best weights")
+    parser.add_argument("--batches", type=int, default=40)
+    parser.add_argument("--batch-size", type=int, default=2048)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    users, trips, users_t, ref_ranks = load_inputs(Path(args.reference), Path(args.catalog), Path(args.features))
+    best, best_loss = search(users_t, trips, ref_ranks, args.batches, args.batch_size, args.seed)
+    report = build_report(best, best_loss, users, users_t, trips, ref_ranks)
+
+    Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    for name, r in report["reference"].items():
+        print(f"\n=== {name.title()} — {r['exact_matches']}/13 exact, {r['within_1']}/13 Δ≤1, {r['in_top_13']}/13 in Top 13 ===")
+        for row in r["trips"]:
+            print(f"{row['ref_rank']:>2}. {row['title']:<28} rank {row['rank']:>2}  Δ {row['delta']:+d}")
+
+    print(f"\n✅ Best weights (loss {best_loss}) saved → {args.output}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+export_output2.py
+-----------------
+Streams the normalized audit rows into the §1 "Output 2 (Analytical Breakdown)"
+CSV (all 34 trips ranked, per output) and precomputes cohort aggregates
+(Top 8 / Top 13 counts, mean rank and score per trip, overall and per age band).
+
+Rows come from Supabase (trip_audit_rows) or a local SQLite store. When reading
+from Supabase, --sqlite also mirrors everything into the SQLite store for offline use.
+--backfill first rebuilds the normalized rows from existing trip_outputs.audit_table
+blobs (or from local output_*.json files with --source sqlite).
+
+Usage:
+    python scripts/export_output2.py --source supabase --sqlite data/audit.sqlite \
+        --csv output2.csv --aggregates cohort_aggregates.csv [--backfill]
+    python scripts/export_output2.py --source sqlite --sqlite data/audit.sqlite --csv output2.csv
+"""
+
+import csv, json, argparse, sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from logic.audit_store import (
+    AGGREGATE_COLUMNS, SQLiteAuditStore, SupabaseAuditStore,
+    age_band, normalize_audit_rows, output_record,
+)
+
+OUTPUT2_COLUMNS = [
+    "output_id", "user_name", "created_at", "age", "rank",
+    "trip", "score", "tier", "pb_sd", "continent",
+]
+
+BACKFILL_PAGE_SIZE = 200
+
+
+# === Backfill ===
+def backfill_supabase(client, store):
+    start = 0
+    total = 0
+    while True:
+        result = (
+            client.table("trip_outputs")
+            .select("id, user_name, created_at, audit_table, form_responses(normalized_json)")
+            .order("created_at")
+            .order("id")
+            .range(start, start + BACKFILL_PAGE_SIZE - 1)
+            .execute()
+        )
+        batch = result.data or []
+        for row in batch:
+            normalized = (row.get("form_responses") or {}).get("normalized_json") or {}
+            output = output_record(row["id"], row.get("user_name"), row.get("created_at"), normalized)
+            store.add_output(output, normalize_audit_rows(row["id"], row.get("audit_table") or []))
+        total += len(batch)
+        if len(batch) < BACKFILL_PAGE_SIZE:
+            break
+        start += BACKFILL_PAGE_SIZE
+    print(f"🧾 Backfilled {total} trip_outputs rows")
+
+
+def backfill_local(directory: Path, store):
+    paths = sorted(directory.glob("output_*.json"))
+    for path in paths:
+        base_name = path.stem[len("output_"):]
+        with open(path, "r") as f:
+            output_json = json.load(f)
+        output = output_record(base_name, base_name.replace("_", " ").replace("-", " ").title(), None, {})
+        store.add_output(output, normalize_audit_rows(base_name, output_json.get("audit_table", [])))
+    print(f"🧾 Backfilled {len(paths)} local output files")
+
+
+# === Cohort Aggregates ===
+class CohortAggregator:
+    """
+    Running per-(cohort, trip) totals, updated one audit row at a time.
+    """
+
+    def __init__(self):
+        self.totals = defaultdict(lambda: {"outputs": 0, "top8": 0, "top13": 0, "rank": 0, "score": 0.0})
+
+    def add(self, row: dict):
+        for cohort in ("all", "age_" + age_band(row.get("age"))):
+            t = self.totals[(cohort, row["trip"])]
+            t["outputs"] += 1
+            t["top8"] += row["rank"] <= 8
+            t["top13"] += row["rank"] <= 13
+            t["rank"] += row["rank"]
+            t["score"] += row.get("score") or 0.0
+
+    def results(self) -> list:
+        return [
+            {
+                "cohort": cohort,
+                "trip": trip,
+                "outputs": t["outputs"],
+                "top8_count": t["top8"],
+                "top8_rate": round(t["top8"] / t["outputs"], 4),
+                "top13_count": t["top13"],
+                "mean_rank": round(t["rank"] / t["outputs"], 2),
+                "mean_score": round(t["score"] / t["outputs"], 2),
+            }
+            for (cohort, trip), t in sorted(self.totals.items())
+        ]
+
+
+# === Streaming Export ===
+def export(source, csv_path: Path, mirror=None):
+    """
+    One pass over the audit rows: write Output 2, accumulate aggregates,
+    and (optionally) mirror each output into the offline store.
+    """
+    aggregator = CohortAggregator()
+    pending_output, pending_rows = None, []
+    count = 0
+
+    def flush():
+        if mirror is not None and pending_output is not None:
+            mirror.add_output(pending_output, pending_rows)
+
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=OUTPUT2_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+
+        for row in source.iter_rows():
+            writer.writerow(row)
+            aggregator.add(row)
+            count += 1
+
+            if mirror is not None:
+                if pending_output is None or pending_output["output_id"] != row["output_id"]:
+                    flush()
+                    pending_output = {k: row.get(k) for k in ("output_id", "user_name", "created_at", "age", "home_country")}
+                    pending_rows = []
+                pending_rows.append({k: row.get(k) for k in ("output_id", "trip", "rank", "score", "tier", "pb_sd", "continent")})
+
+        flush()
+
+    print(f"✅ Exported {count} audit rows → {csv_path}")
+    return aggregator.results()
+
+
+def write_aggregates_csv(aggregates: list, path: Path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=AGGREGATE_COLUMNS)
+        writer.writeheader()
+        writer.writerows(aggregates)
+    print(f"✅ Wrote {len(aggregates)} cohort aggregates → {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream Output 2 CSV and cohort aggregates from normalized audit rows")
+    parser.add_argument("--source", choices=["supabase", "sqlite"], default="supabase")
+    parser.add_argument("--sqlite", help="SQLite store path (source for --source sqlite, offline mirror otherwise)")
+    parser.add_argument("--csv", default="output2.csv", help="Output 2 CSV path")
+    parser.add_argument("--aggregates", help="Optional cohort aggregates CSV path")
+    parser.add_argument("--backfill", action="store_true", help="Rebuild normalized rows from trip_outputs / output_*.json first")
+    parser.add_argument("--local-dir", default=".", help="Where output_*.json live for a SQLite backfill")
+    args = parser.parse_args()
+
+    sqlite_store = SQLiteAuditStore(args.sqlite) if args.sqlite else None
+
+    if args.source == "supabase":
+        from supabase_client import supabase
+
+        source = SupabaseAuditStore(supabase)
+        if args.backfill:
+            backfill_supabase(supabase, source)
+        mirror = sqlite_store
+    else:
+        if sqlite_store is None:
+            parser.error("--source sqlite requires --sqlite")
+        source = sqlite_store
+        if args.backfill:
+            backfill_local(Path(args.local_dir), source)
+        mirror = None
+
+    aggregates = export(source, Path(args.csv), mirror)
+    source.save_aggregates(aggregates)
+    if mirror is not None:
+        mirror.save_aggregates(aggregates)
+    if args.aggregates:
+        write_aggregates_csv(aggregates, Path(args.aggregates))
+
+    if sqlite_store is not None:
+        sqlite_store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+-- Normalized copy of trip_outputs.audit_table, one row per ranked trip.
+-- output_id is trip_outputs.id stored as text.
+
+create table if not exists trip_audit_outputs (
+    output_id text primary key,
+    user_name text,
+    created_at timestamptz,
+    age integer,
+    home_country text
+);
+
+create table if not exists trip_audit_rows (
+    output_id text not null references trip_audit_outputs (output_id) on delete cascade,
+    trip text not null,
+    rank integer not null,
+    score real,
+    tier text,
+    pb_sd text,
+    continent text,
+    primary key (output_id, rank)
+);
+
+create index if not exists trip_audit_rows_trip_rank_idx on trip_audit_rows (trip, rank);
+create index if not exists trip_audit_rows_continent_idx on trip_audit_rows (continent);
+create index if not exists trip_audit_outputs_age_idx on trip_audit_outputs (age);
+
+-- Precomputed by scripts/export_output2.py
+create table if not exists trip_cohort_aggregates (
+    cohort text not null,
+    trip text not null,
+    outputs integer,
+    top8_count integer,
+    top8_rate real,
+    top13_count integer,
+    mean_rank real,
+    mean_score real,
+    primary key (cohort, trip)
+);
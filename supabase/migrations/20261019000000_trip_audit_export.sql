@@ -0,0 +1,11 @@
+-- Export view with a stable (created_at, output_id, rank) order, matching the SQLite backend.
+
+create index if not exists trip_audit_outputs_created_at_idx on trip_audit_outputs (created_at, output_id);
+
+create or replace view trip_audit_export as
+select o.user_name, o.created_at, o.age, o.home_country, r.*
+from trip_audit_rows r
+join trip_audit_outputs o using (output_id);
+
+-- Lets save_aggregates upsert a new export and then drop rows from older ones.
+alter table trip_cohort_aggregates add column if not exists export_id text;
@@ -0,0 +1,6 @@
+-- iter_rows pages trip_audit_export by (created_at nulls first, output_id, rank) > last key;
+-- rebuild the created_at index in that order so each page is a range scan.
+
+drop index if exists trip_audit_outputs_created_at_idx;
+create index trip_audit_outputs_created_at_idx
+    on trip_audit_outputs (created_at asc nulls first, output_id);